@@ -111,6 +111,11 @@ def main() -> None:
         default="function",
         help="Analysis granularity level"
     )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="In line mode, estimate line timings from function-level profiling instead of tracing every line"
+    )
     parser.add_argument(
         "--output",
         type=str,
@@ -169,7 +174,7 @@ def main() -> None:
         analyzer = PerformanceAnalyzer()
         
         # Perform analysis
-        result = analyzer.analyze_file(args.file_path, args.mode)
+        result = analyzer.analyze_file(args.file_path, args.mode, fast=args.fast)
         result["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         # Save results
@@ -1,5 +1,10 @@
+import functools
+import inspect
 import random
+import re
 import tkinter as tk
+import tkinter.font as tkfont
+import weakref
 from tkinter import ttk, filedialog, messagebox, simpledialog
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
@@ -9,6 +14,87 @@ import ast
 from typing import Dict, List, Any, Optional, Callable
 from recommender import ASTVisitor, RuleManager, CustomRuleBuilder
 
+# Static combobox choices, shared by every dialog instead of rebuilt per open
+_ANALYSIS_MODES = ("function", "line", "memory")
+_RULE_TYPES = ("AST", "Non-AST")
+
+# Matches "lambda stats: ...", "lambda node: ..." etc. and captures the condition body
+_LAMBDA_RE = re.compile(r'^\s*lambda\s*\w*\s*:\s*(.*)$', re.DOTALL)
+# Headers written by the rule builders, checked with a single startswith call
+_LAMBDA_PREFIXES = ("lambda stats:", "lambda node:")
+
+
+def _strip_lambda_prefix(condition):
+    """Return the condition body without a leading "lambda <arg>:" header."""
+    if condition.startswith(_LAMBDA_PREFIXES):
+        return condition.partition(':')[2].strip()
+    match = _LAMBDA_RE.match(condition)
+    return match.group(1).strip() if match else condition.strip()
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_check(condition, is_ast_based):
+    """Compile a rule condition into a check function, reusing earlier compilations."""
+    if is_ast_based:
+        # For AST rules use 'node' as parameter
+        return eval(f"lambda node: {condition}", {'ast': ast})
+    # For non-AST rules use 'stats' as parameter
+    return eval(f"lambda stats: {condition}")
+
+
+class RuleTable:
+    """Rule metadata kept as parallel lists, one entry per row of the rules listbox."""
+
+    def __init__(self, rules=None):
+        self.names = []
+        self.descriptions = []
+        self.is_ast = []
+        self.checks = []
+        self.suggestions = []
+        self.name_to_index = {}
+        for name, rule in (rules or {}).items():
+            self.append(name, rule)
+
+    def __len__(self):
+        return len(self.names)
+
+    def append(self, name, rule):
+        """Add a rule as the last row."""
+        self.name_to_index[name] = len(self.names)
+        self.names.append(name)
+        self.descriptions.append(rule['description'])
+        self.is_ast.append(rule.get('is_ast_based', True))
+        self.checks.append(rule['check'])
+        self.suggestions.append(rule['suggestion'])
+
+    def replace(self, name, rule):
+        """Overwrite the row of an existing rule and return its index."""
+        index = self.name_to_index[name]
+        self.descriptions[index] = rule['description']
+        self.is_ast[index] = rule.get('is_ast_based', True)
+        self.checks[index] = rule['check']
+        self.suggestions[index] = rule['suggestion']
+        return index
+
+    def remove(self, name):
+        """Delete the row of a rule and return the index it occupied."""
+        index = self.name_to_index.pop(name)
+        for column in (self.names, self.descriptions, self.is_ast, self.checks, self.suggestions):
+            del column[index]
+        for shifted, shifted_name in enumerate(self.names[index:], index):
+            self.name_to_index[shifted_name] = shifted
+        return index
+
+    def rows(self, start, stop):
+        """Format the listbox text for the rows in [start, stop)."""
+        return [
+            f"{name} ({'AST' if is_ast else 'Non-AST'}): {description}"
+            for name, is_ast, description in zip(
+                self.names[start:stop], self.is_ast[start:stop], self.descriptions[start:stop]
+            )
+        ]
+
+
 class PerformanceGUI:
     def __init__(self, master):
         self.master = master
@@ -25,6 +111,18 @@ class PerformanceGUI:
         self.function_rects = []
         # Rule Manager
         self.rule_manager = RuleManager()
+        self._rules_cache = None
+        self._rules_version = 0
+        self._last_rendered_version = -1
+        self._lambda_src_cache = {}
+        # Rule editor dialogs, created on first use and then reused
+        self._add_dialog = None
+        self._edit_dialog = None
+        # Rules list state: only the visible window of rows lives in the Listbox
+        self._rule_table = RuleTable()
+        self._rules_offset = 0
+        self._rules_visible = 20
+        self._selected_rule_row = None
         # Create UI components
         self.create_widgets()
 
@@ -44,7 +142,7 @@ class PerformanceGUI:
         # Analysis mode selection
         self.mode_var = tk.StringVar(value="function")
         mode_combobox = ttk.Combobox(control_frame, textvariable=self.mode_var, width=10,
-                                    values=["function", "line", "memory"], state="readonly")
+                                    values=_ANALYSIS_MODES, state="readonly")
         mode_combobox.pack(side=tk.LEFT, padx=5)
         mode_combobox.bind("<<ComboboxSelected>>", self.update_tab_layout)
 
@@ -92,7 +190,7 @@ class PerformanceGUI:
             visitor.visit(tree)
             suggestions.extend(visitor.suggestions)
 
-            for rule_name, rule in self.rule_manager.get_all_rules().items():
+            for rule_name, rule in self._rules_snapshot().items():
                 if self.mode_var.get() == "function":
                     for result in self.current_data["results"]:
                         if not rule.get('is_ast_based', True) and rule["check"](result):
@@ -696,7 +794,7 @@ class PerformanceGUI:
         ttk.Label(control_frame, text="Rule Type:").pack(side=tk.LEFT)
         self.rule_type_var = tk.StringVar(value="AST")
         ttk.Combobox(control_frame, textvariable=self.rule_type_var, 
-                    values=["AST", "Non-AST"], state="readonly", width=8).pack(side=tk.LEFT, padx=5)
+                    values=_RULE_TYPES, state="readonly", width=8).pack(side=tk.LEFT, padx=5)
         
         # Action buttons
         ttk.Button(control_frame, text="Add Rule", command=self.add_rule).pack(side=tk.LEFT, padx=5)
@@ -708,12 +806,22 @@ class PerformanceGUI:
         list_frame.pack(fill=tk.BOTH, expand=True)
         
         self.rules_listbox = tk.Listbox(list_frame, height=20)
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.rules_listbox.yview)
-        self.rules_listbox.configure(yscrollcommand=scrollbar.set)
+        self.rules_scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self._scroll_rules)
         
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.rules_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.rules_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
+        # The listbox is virtualized: scrolling re-renders the visible window only
+        self._rules_offset = 0
+        self._rules_visible = int(self.rules_listbox.cget("height"))
+        # Row height in pixels, measured once rather than on every resize step
+        self._rules_linespace = tkfont.Font(font=self.rules_listbox.cget("font")).metrics("linespace")
+        self._last_rendered_version = -1
+        self.rules_listbox.bind("<Configure>", self._on_rules_configure)
+        self.rules_listbox.bind("<<ListboxSelect>>", self._on_rules_select)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>", "<Prior>", "<Next>"):
+            self.rules_listbox.bind(sequence, self._on_rules_scroll_event)
+        
         # Populate the listbox
         self.update_rules_list()
         
@@ -722,110 +830,312 @@ class PerformanceGUI:
 
     def update_rules_list(self):
         """Update the rules listbox with all available rules."""
+        # Nothing to do if the rules have not changed since the last render
+        if self._rules_version == self._last_rendered_version:
+            return
+        self._last_rendered_version = self._rules_version
+        
+        self._rule_table = RuleTable(self._rules_snapshot())
+        self._selected_rule_row = None
+        self._render_rules_window()
+
+    def _insert_row(self, name, rule):
+        """Append a row for a newly added rule without rebuilding the list."""
+        self._rule_table.append(name, rule)
+        self._last_rendered_version = self._rules_version
+        
+        # The new row is only drawn if the visible window still has room for it
+        if self.rules_listbox.size() < self._rules_visible:
+            index = len(self._rule_table) - 1
+            self.rules_listbox.insert(tk.END, *self._rule_table.rows(index, index + 1))
+        self._update_rules_scrollbar()
+
+    def _delete_row(self, name):
+        """Remove the row of a deleted rule without rebuilding the list."""
+        index = self._rule_table.remove(name)
+        self._last_rendered_version = self._rules_version
+        
+        if self._selected_rule_row == index:
+            self._selected_rule_row = None
+        elif self._selected_rule_row is not None and self._selected_rule_row > index:
+            self._selected_rule_row -= 1
+        
+        # Rows below the deleted one shift up, so redraw the visible window only
+        self._render_rules_window()
+
+    def _replace_row(self, name, rule):
+        """Refresh the row of an edited rule in place."""
+        index = self._rule_table.replace(name, rule)
+        self._last_rendered_version = self._rules_version
+        
+        position = index - self._rules_offset
+        if 0 <= position < self.rules_listbox.size():
+            self.rules_listbox.delete(position)
+            self.rules_listbox.insert(position, *self._rule_table.rows(index, index + 1))
+            if self._selected_rule_row == index:
+                self.rules_listbox.selection_set(position)
+
+    def _invalidate_rules(self):
+        """Mark the cached rule dict and the rendered rules list as stale."""
+        self._rules_cache = None
+        self._rules_version += 1
+
+    def _rules_snapshot(self):
+        """Return the rule dict, fetching it from the rule manager only after a change."""
+        if self._rules_cache is None:
+            self._rules_cache = self.rule_manager.get_all_rules()
+        return self._rules_cache
+
+    def _render_rules_window(self):
+        """Insert only the rows that fit in the visible part of the rules listbox."""
+        total = len(self._rule_table)
+        visible = max(1, self._rules_visible)
+        self._rules_offset = max(0, min(self._rules_offset, total - visible))
+        first = self._rules_offset
+        last = min(total, first + visible)
+        
         self.rules_listbox.delete(0, tk.END)
+        if last > first:
+            self.rules_listbox.insert(tk.END, *self._rule_table.rows(first, last))
         
-        for name, rule in self.rule_manager.get_all_rules().items():
-            rule_type = "AST" if rule.get('is_ast_based', True) else "Non-AST"
-            self.rules_listbox.insert(tk.END, f"{name} ({rule_type}): {rule['description']}")
+        # Restore the selection if the selected row is still on screen
+        if self._selected_rule_row is not None and first <= self._selected_rule_row < last:
+            self.rules_listbox.selection_set(self._selected_rule_row - first)
+        
+        self._update_rules_scrollbar()
+
+    def _update_rules_scrollbar(self):
+        """Sync the scrollbar slider with the visible window of rule rows."""
+        total = len(self._rule_table)
+        if total:
+            first = self._rules_offset
+            last = min(total, first + self.rules_listbox.size())
+            self.rules_scrollbar.set(first / total, last / total)
+        else:
+            self.rules_scrollbar.set(0.0, 1.0)
+
+    def _scroll_rules(self, *args):
+        """Translate scrollbar commands ("moveto"/"scroll") into a new window offset."""
+        if args[0] == "moveto":
+            self._rules_offset = int(float(args[1]) * len(self._rule_table))
+        elif args[0] == "scroll":
+            step = self._rules_visible if args[2] == "pages" else 1
+            self._rules_offset += int(args[1]) * step
+        self._render_rules_window()
+
+    def _on_rules_scroll_event(self, event):
+        """Handle mouse wheel and Page Up/Down on the rules listbox."""
+        if event.keysym == "Prior":
+            self._scroll_rules("scroll", -1, "pages")
+        elif event.keysym == "Next":
+            self._scroll_rules("scroll", 1, "pages")
+        elif event.num == 4 or getattr(event, 'delta', 0) > 0:
+            self._scroll_rules("scroll", -3, "units")
+        else:
+            self._scroll_rules("scroll", 3, "units")
+        return "break"
+
+    def _on_rules_configure(self, event):
+        """Recompute how many rows fit when the rules listbox is resized."""
+        visible = max(1, event.height // max(1, self._rules_linespace + 1))
+        if visible != self._rules_visible:
+            self._rules_visible = visible
+            self._render_rules_window()
+
+    def _on_rules_select(self, event=None):
+        """Remember the selected rule as an absolute row index."""
+        selection = self.rules_listbox.curselection()
+        if selection:
+            self._selected_rule_row = self._rules_offset + selection[0]
+
+    def _selected_rule_name(self):
+        """Return the name of the selected rule, or None if nothing is selected."""
+        if self._selected_rule_row is None or self._selected_rule_row >= len(self._rule_table):
+            return None
+        return self._rule_table.names[self._selected_rule_row]
 
     def add_rule(self):
         """Add a new rule of the selected type."""
         rule_type = self.rule_type_var.get()
         is_ast_based = (rule_type == "AST")
         
-        rule_dialog = tk.Toplevel(self.master)
+        # The dialog is built once and reused (hidden) for later rules
+        if self._add_dialog is None or not self._add_dialog.winfo_exists():
+            self._build_add_dialog()
+        rule_dialog = self._add_dialog
         rule_dialog.title(f"Add {rule_type} Rule")
+        self._add_is_ast = is_ast_based
+        # Names taken when the dialog opens, checked on submit without refetching rules
+        self._add_existing_names = frozenset(self._rules_snapshot())
+        
+        # Clear the fields left over from the previous rule
+        for var in self._add_vars.values():
+            var.set("")
+        
+        # Additional field for AST rules
+        for widget in self._add_node_widgets:
+            if is_ast_based:
+                widget.grid()
+            else:
+                widget.grid_remove()
+        self._add_submit_btn.grid(row=5 if is_ast_based else 4, column=0, columnspan=2, pady=10)
+        
+        # Compute the geometry once, then show the finished dialog
+        rule_dialog.update_idletasks()
+        rule_dialog.deiconify()
+        rule_dialog.lift()
+
+    def _build_add_dialog(self):
+        """Create the hidden add-rule dialog and keep its widgets for reuse."""
+        rule_dialog = tk.Toplevel(self.master)
+        # Keep the dialog hidden while its widgets are laid out
+        rule_dialog.withdraw()
         rule_dialog.geometry("500x400")
+        # Closing the window only hides it so the next add_rule can reuse it
+        rule_dialog.protocol("WM_DELETE_WINDOW", rule_dialog.withdraw)
+        
+        self._add_vars = {
+            key: tk.StringVar()
+            for key in ("name", "description", "suggestion", "condition", "node_type")
+        }
         
         # Rule fields
         ttk.Label(rule_dialog, text="Rule Name:").grid(row=0, column=0, padx=10, pady=5, sticky=tk.W)
-        name_var = tk.StringVar()
-        ttk.Entry(rule_dialog, textvariable=name_var, width=40).grid(row=0, column=1, padx=10, pady=5)
+        ttk.Entry(rule_dialog, textvariable=self._add_vars["name"], width=40).grid(row=0, column=1, padx=10, pady=5)
         
         ttk.Label(rule_dialog, text="Description:").grid(row=1, column=0, padx=10, pady=5, sticky=tk.W)
-        desc_var = tk.StringVar()
-        ttk.Entry(rule_dialog, textvariable=desc_var, width=40).grid(row=1, column=1, padx=10, pady=5)
+        ttk.Entry(rule_dialog, textvariable=self._add_vars["description"], width=40).grid(row=1, column=1, padx=10, pady=5)
         
         ttk.Label(rule_dialog, text="Suggestion:").grid(row=2, column=0, padx=10, pady=5, sticky=tk.W)
-        sugg_var = tk.StringVar()
-        ttk.Entry(rule_dialog, textvariable=sugg_var, width=40).grid(row=2, column=1, padx=10, pady=5)
+        ttk.Entry(rule_dialog, textvariable=self._add_vars["suggestion"], width=40).grid(row=2, column=1, padx=10, pady=5)
         
         ttk.Label(rule_dialog, text="Check Condition:").grid(row=3, column=0, padx=10, pady=5, sticky=tk.W)
-        cond_var = tk.StringVar()
-        cond_entry = ttk.Entry(rule_dialog, textvariable=cond_var, width=40)
-        cond_entry.grid(row=3, column=1, padx=10, pady=5)
+        ttk.Entry(rule_dialog, textvariable=self._add_vars["condition"], width=40).grid(row=3, column=1, padx=10, pady=5)
         
-        # Additional field for AST rules
-        node_var = tk.StringVar()
-        if is_ast_based:
-            ttk.Label(rule_dialog, text="AST Node Type (optional):").grid(row=4, column=0, padx=10, pady=5, sticky=tk.W)
-            ttk.Entry(rule_dialog, textvariable=node_var, width=40).grid(row=4, column=1, padx=10, pady=5)
+        # Node type row; hidden with grid_remove() for non-AST rules
+        node_label = ttk.Label(rule_dialog, text="AST Node Type (optional):")
+        node_label.grid(row=4, column=0, padx=10, pady=5, sticky=tk.W)
+        node_entry = ttk.Entry(rule_dialog, textvariable=self._add_vars["node_type"], width=40)
+        node_entry.grid(row=4, column=1, padx=10, pady=5)
+        self._add_node_widgets = (node_label, node_entry)
         
-        def submit_rule():
-            name = name_var.get().strip()
-            if not name:
-                messagebox.showwarning("Error", "Rule name cannot be empty")
-                return
+        self._add_submit_btn = ttk.Button(rule_dialog, text="Submit", command=self._submit_new_rule)
+        self._add_dialog = rule_dialog
+
+    def _submit_new_rule(self):
+        """Validate the add-rule dialog and register the new rule."""
+        fields = {key: var.get() for key, var in self._add_vars.items()}
+        name = fields["name"].strip()
+        
+        # Collect every validation problem and report them in one dialog
+        errors = []
+        if not name:
+            errors.append("Rule name cannot be empty")
+        if not fields["condition"].strip():
+            errors.append("Check condition cannot be empty")
+        if name and name in self._add_existing_names:
+            errors.append(f"Rule '{name}' already exists")
+        if errors:
+            messagebox.showwarning("Error", "\n".join(errors))
+            return
+        
+        try:
+            if self._add_is_ast:
+                rule = CustomRuleBuilder.build_ast_rule(
+                    check_condition=fields["condition"],
+                    description=fields["description"],
+                    suggestion=fields["suggestion"],
+                    node_type=fields["node_type"] if fields["node_type"].strip() else None
+                )
+            else:
+                rule = CustomRuleBuilder.build_non_ast_rule(
+                    check_condition=fields["condition"],
+                    description=fields["description"],
+                    suggestion=fields["suggestion"]
+                )
             
-            if name in self.rule_manager.get_all_rules():
-                messagebox.showwarning("Error", f"Rule '{name}' already exists")
-                return
+            self.rule_manager.add_rule(
+                name,
+                rule['description'],
+                rule['check'],
+                rule['suggestion'],
+                rule['is_ast_based']
+            )
+            self._invalidate_rules()
             
-            if not cond_var.get().strip():
-                messagebox.showwarning("Error", "Check condition cannot be empty")
-                return
+            self._insert_row(name, self._rules_snapshot()[name])
+            self._add_dialog.withdraw()
             
-            try:
-                if is_ast_based:
-                    rule = CustomRuleBuilder.build_ast_rule(
-                        check_condition=cond_var.get(),
-                        description=desc_var.get(),
-                        suggestion=sugg_var.get(),
-                        node_type=node_var.get() if node_var.get().strip() else None
-                    )
-                else:
-                    rule = CustomRuleBuilder.build_non_ast_rule(
-                        check_condition=cond_var.get(),
-                        description=desc_var.get(),
-                        suggestion=sugg_var.get()
-                    )
-                
-                self.rule_manager.add_rule(
-                    name,
-                    rule['description'],
-                    rule['check'],
-                    rule['suggestion'],
-                    rule['is_ast_based']
-                )
-                
-                self.update_rules_list()
-                rule_dialog.destroy()
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to create rule: {str(e)}")
-        
-        ttk.Button(rule_dialog, text="Submit", command=submit_rule).grid(
-            row=5 if is_ast_based else 4, 
-            column=0, columnspan=2, pady=10
-        )
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to create rule: {str(e)}")
 
     def edit_rule(self):
         """Edit an existing rule with direct lambda expression editing."""
-        selected_index = self.rules_listbox.curselection()
-        if not selected_index:
+        rule_name = self._selected_rule_name()
+        if rule_name is None:
             messagebox.showwarning("No Selection", "Please select a rule to edit")
             return
         
-        selected_text = self.rules_listbox.get(selected_index[0])
-        rule_name = selected_text.split(" (")[0]
-        rule = self.rule_manager.get_all_rules()[rule_name]
+        rule = self._rules_snapshot()[rule_name]
         
         rule_type = "AST" if rule.get('is_ast_based', True) else "Non-AST"
         is_ast_based = (rule_type == "AST")
         
-        rule_dialog = tk.Toplevel(self.master)
+        # The dialog is built once and reused (hidden) for later edits
+        if self._edit_dialog is None or not self._edit_dialog.winfo_exists():
+            self._build_edit_dialog()
+        rule_dialog = self._edit_dialog
         rule_dialog.title(f"Edit {rule_type} Rule")
+        
+        # Load the selected rule into the reused widgets
+        self._edit_name_label.config(text=rule_name)
+        self._edit_desc_entry.delete(0, tk.END)
+        self._edit_desc_entry.insert(0, rule['description'])
+        self._edit_sugg_entry.delete(0, tk.END)
+        self._edit_sugg_entry.insert(0, rule['suggestion'])
+        
+        # Get the lambda source code
+        cond_text = self._edit_cond_text
+        cond_text.delete("1.0", tk.END)
+        cond_text.insert("1.0", self.get_lambda_source(rule['check']))
+        # Seeding the widget sets the modified flag; clear it so only user edits count
+        cond_text.edit_modified(False)
+        cond_text.edit_reset()
+        
+        # Node type for AST rules
+        self._edit_node_var.set("")
+        for widget in self._edit_node_widgets:
+            if is_ast_based:
+                widget.grid()
+            else:
+                widget.grid_remove()
+        if is_ast_based:
+            # Try to extract node type from lambda
+            node_type = self.extract_node_type(rule['check'])
+            if node_type:
+                self._edit_node_var.set(node_type)
+        self._edit_submit_btn.grid(row=5 if is_ast_based else 4, column=0, columnspan=2, pady=10)
+        
+        self._edit_state = {
+            "name": rule_name,
+            "rule": rule,
+            "is_ast_based": is_ast_based,
+            "node_type": self._edit_node_var.get(),
+        }
+        
+        # Compute the geometry once, then show the finished dialog
+        rule_dialog.update_idletasks()
+        rule_dialog.deiconify()
+        rule_dialog.lift()
+
+    def _build_edit_dialog(self):
+        """Create the hidden edit-rule dialog and keep its widgets for reuse."""
+        rule_dialog = tk.Toplevel(self.master)
+        # Keep the dialog hidden while its widgets are laid out
+        rule_dialog.withdraw()
         rule_dialog.geometry("600x275")
+        # Closing the window only hides it so the next edit_rule can reuse it
+        rule_dialog.protocol("WM_DELETE_WINDOW", rule_dialog.withdraw)
         
         # Rule fields in a grid layout
         frame = ttk.Frame(rule_dialog)
@@ -833,105 +1143,111 @@ class PerformanceGUI:
         
         # Rule name (readonly)
         ttk.Label(frame, text="Rule Name:").grid(row=0, column=0, padx=5, pady=5, sticky=tk.W)
-        ttk.Label(frame, text=rule_name).grid(row=0, column=1, padx=5, pady=5, sticky=tk.W)
+        self._edit_name_label = ttk.Label(frame)
+        self._edit_name_label.grid(row=0, column=1, padx=5, pady=5, sticky=tk.W)
         
         # Description
         ttk.Label(frame, text="Description:").grid(row=1, column=0, padx=5, pady=5, sticky=tk.W)
-        desc_entry = ttk.Entry(frame, width=50)
-        desc_entry.insert(0, rule['description'])
-        desc_entry.grid(row=1, column=1, padx=5, pady=5, sticky=tk.W)
+        self._edit_desc_entry = ttk.Entry(frame, width=50)
+        self._edit_desc_entry.grid(row=1, column=1, padx=5, pady=5, sticky=tk.W)
         
         # Suggestion
         ttk.Label(frame, text="Suggestion:").grid(row=2, column=0, padx=5, pady=5, sticky=tk.W)
-        sugg_entry = ttk.Entry(frame, width=50)
-        sugg_entry.insert(0, rule['suggestion'])
-        sugg_entry.grid(row=2, column=1, padx=5, pady=5, sticky=tk.W)
+        self._edit_sugg_entry = ttk.Entry(frame, width=50)
+        self._edit_sugg_entry.grid(row=2, column=1, padx=5, pady=5, sticky=tk.W)
         
         # Check condition - use Text widget for multiline editing
         ttk.Label(frame, text="Check Condition:").grid(row=3, column=0, padx=5, pady=5, sticky=tk.NW)
-        cond_text = tk.Text(frame, wrap=tk.WORD, width=50, height=6)
-        cond_scroll = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=cond_text.yview)
-        cond_text.configure(yscrollcommand=cond_scroll.set)
-        
-        # Get the lambda source code
-        lambda_src = self.get_lambda_source(rule['check'])
-        cond_text.insert("1.0", lambda_src)
-        cond_text.grid(row=3, column=1, padx=5, pady=5, sticky=tk.W)
+        self._edit_cond_text = tk.Text(frame, wrap=tk.WORD, width=50, height=6, undo=False)
+        cond_scroll = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self._edit_cond_text.yview)
+        self._edit_cond_text.configure(yscrollcommand=cond_scroll.set)
+        self._edit_cond_text.grid(row=3, column=1, padx=5, pady=5, sticky=tk.W)
         cond_scroll.grid(row=3, column=2, sticky=tk.NS)
         
-        # Node type for AST rules
-        node_var = tk.StringVar()
-        if is_ast_based:
-            ttk.Label(frame, text="AST Node Type (optional):").grid(row=4, column=0, padx=5, pady=5, sticky=tk.W)
-            node_entry = ttk.Entry(frame, textvariable=node_var, width=50)
+        # Node type row; hidden with grid_remove() for non-AST rules
+        self._edit_node_var = tk.StringVar()
+        node_label = ttk.Label(frame, text="AST Node Type (optional):")
+        node_label.grid(row=4, column=0, padx=5, pady=5, sticky=tk.W)
+        node_entry = ttk.Entry(frame, textvariable=self._edit_node_var, width=50)
+        node_entry.grid(row=4, column=1, padx=5, pady=5, sticky=tk.W)
+        self._edit_node_widgets = (node_label, node_entry)
+        
+        self._edit_submit_btn = ttk.Button(frame, text="Save Changes", command=self._submit_edit)
+        self._edit_dialog = rule_dialog
+
+    def _submit_edit(self):
+        """Apply the edit-rule dialog to the rule being edited."""
+        state = self._edit_state
+        rule_name = state["name"]
+        rule = state["rule"]
+        cond_text = self._edit_cond_text
+        removed = added = False
+        try:
+            # Get the edited values
+            new_desc = self._edit_desc_entry.get()
+            new_sugg = self._edit_sugg_entry.get()
+            new_node = self._edit_node_var.get()
             
-            # Try to extract node type from lambda
-            node_type = self.extract_node_type(rule['check'])
-            if node_type:
-                node_var.set(node_type)
-                
-            node_entry.grid(row=4, column=1, padx=5, pady=5, sticky=tk.W)
-        
-        # Submit button
-        def submit_edit():
-            try:
-                # Get the edited values
-                new_desc = desc_entry.get()
-                new_sugg = sugg_entry.get()
-                new_cond = cond_text.get("1.0", tk.END).strip()
-                
-                # Remove any lambda prefix if present
-                if new_cond.startswith("lambda stats:"):
-                    new_cond = new_cond.split(':', 1)[1].strip()
-                elif new_cond.startswith("lambda node:"):
-                    new_cond = new_cond.split(':', 1)[1].strip()
-                
-                # Remove the old rule
-                self.rule_manager.remove_rule(rule_name)
-                
-                # Convert condition text back to function
-                if is_ast_based:
-                    node_type = node_var.get() if node_var.get().strip() else None
-                    new_rule = CustomRuleBuilder.build_ast_rule(
-                        check_condition=new_cond,
-                        description=new_desc,
-                        suggestion=new_sugg,
-                        node_type=node_type
-                    )
-                else:
-                    new_rule = CustomRuleBuilder.build_non_ast_rule(
-                        check_condition=new_cond,
-                        description=new_desc,
-                        suggestion=new_sugg
-                    )
-                
-                # Add the new rule
+            # Nothing was changed: keep the existing rule instead of rebuilding it
+            if (new_desc == rule['description'] and new_sugg == rule['suggestion']
+                    and not cond_text.edit_modified() and new_node == state["node_type"]):
+                self._edit_dialog.withdraw()
+                messagebox.showinfo("No Changes", "Rule was not modified")
+                return
+            
+            new_cond = cond_text.get("1.0", tk.END).strip()
+            
+            # Remove any lambda prefix if present
+            new_cond = _strip_lambda_prefix(new_cond)
+            
+            # Remove the old rule
+            self.rule_manager.remove_rule(rule_name)
+            removed = True
+            self._invalidate_rules()
+            
+            # Convert condition text back to function
+            if state["is_ast_based"]:
+                node_type = new_node if new_node.strip() else None
+                new_rule = CustomRuleBuilder.build_ast_rule(
+                    check_condition=new_cond,
+                    description=new_desc,
+                    suggestion=new_sugg,
+                    node_type=node_type
+                )
+            else:
+                new_rule = CustomRuleBuilder.build_non_ast_rule(
+                    check_condition=new_cond,
+                    description=new_desc,
+                    suggestion=new_sugg
+                )
+            
+            # Add the new rule
+            self.rule_manager.add_rule(
+                rule_name,
+                new_rule['description'],
+                new_rule['check'],
+                new_rule['suggestion'],
+                new_rule['is_ast_based']
+            )
+            added = True
+            self._invalidate_rules()
+            
+            self._replace_row(rule_name, self._rules_snapshot()[rule_name])
+            self._edit_dialog.withdraw()
+            messagebox.showinfo("Success", "Rule updated successfully")
+            
+        except Exception as e:
+            # Restore original rule if update failed after removing it
+            if removed and not added:
                 self.rule_manager.add_rule(
                     rule_name,
-                    new_rule['description'],
-                    new_rule['check'],
-                    new_rule['suggestion'],
-                    new_rule['is_ast_based']
+                    rule['description'],
+                    rule['check'],
+                    rule['suggestion'],
+                    rule['is_ast_based']
                 )
-                
-                self.update_rules_list()
-                rule_dialog.destroy()
-                messagebox.showinfo("Success", "Rule updated successfully")
-                
-            except Exception as e:
-                # Restore original rule if update failed
-                if rule_name not in self.rule_manager.get_all_rules():
-                    self.rule_manager.add_rule(
-                        rule_name,
-                        rule['description'],
-                        rule['check'],
-                        rule['suggestion'],
-                        rule['is_ast_based']
-                    )
-                messagebox.showerror("Error", f"Failed to update rule: {str(e)}")
-        
-        submit_btn = ttk.Button(frame, text="Save Changes", command=submit_edit)
-        submit_btn.grid(row=5 if is_ast_based else 4, column=0, columnspan=2, pady=10)
+                self._invalidate_rules()
+            messagebox.showerror("Error", f"Failed to update rule: {str(e)}")
 
     # Helper methods for lambda manipulation
     def get_lambda_source(self, lambda_func):
@@ -946,15 +1262,17 @@ class PerformanceGUI:
         """
         # First check if we have a saved original condition
         if hasattr(lambda_func, 'original_condition'):
-            condition = lambda_func.original_condition
             # Ensure consistent return format
-            if condition.startswith("lambda stats:"):
-                return condition.split(':', 1)[1].strip()
-            return condition
+            return _strip_lambda_prefix(lambda_func.original_condition)
+        
+        # Reuse the result of an earlier inspection of the same function
+        key = id(lambda_func)
+        cached = self._lambda_src_cache.get(key)
+        if cached is not None:
+            return cached
         
         # For directly defined lambda functions, attempt to get source code
         try:
-            import inspect
             source = inspect.getsource(lambda_func).strip()
             
             # Handle lambda assigned to variable
@@ -966,16 +1284,26 @@ class PerformanceGUI:
                 source = source[:-1].strip()
                 
             # Extract the condition part
-            if source.startswith('lambda'):
-                return source.split(':', 1)[1].strip()
-            
-            return source
+            source = _strip_lambda_prefix(source)
         except Exception as e:
             print(f"Warning: Failed to get lambda source code - {e}")
             return "True"  # Default fallback value
+        
+        # Drop the entry when the function is collected so a reused id is never stale
+        try:
+            weakref.finalize(lambda_func, self._lambda_src_cache.pop, key, None)
+            self._lambda_src_cache[key] = source
+        except TypeError:
+            pass
+        return source
 
     def extract_node_type(self, lambda_func):
         """Extract AST node type from a lambda function's closure."""
+        # Builders may record the node type on the check itself
+        node_type = getattr(lambda_func, 'node_type', None)
+        if node_type is not None:
+            return node_type
+        
         if not hasattr(lambda_func, '__closure__') or not lambda_func.__closure__:
             return None
         
@@ -987,45 +1315,34 @@ class PerformanceGUI:
     def create_lambda_function(self, lambda_str, is_ast_based):
         """Convert lambda string back to a function."""
         try:
-            # Clean up the input string
-            lambda_str = lambda_str.strip()
-            if lambda_str.startswith("lambda"):
-                lambda_str = lambda_str.split('lambda', 1)[1].strip()
-            if ':' in lambda_str:
-                # Extract the condition part after the colon
-                condition = lambda_str.split(':', 1)[1].strip()
-            else:
-                condition = lambda_str
+            # Extract the condition part after the lambda prefix, if any
+            condition = _strip_lambda_prefix(lambda_str)
             
-            if is_ast_based:
-                # For AST rules use 'node' as parameter
-                return eval(f"lambda node: {condition}", {'ast': ast})
-            else:
-                # For non-AST rules use 'stats' as parameter
-                return eval(f"lambda stats: {condition}")
+            # Wrap the shared compiled function so attributes stay per-caller
+            check = functools.partial(_compile_check(condition, is_ast_based))
+            check.original_condition = condition
+            return check
         except Exception as e:
             raise ValueError(f"Invalid lambda expression: {str(e)}")
 
     def delete_rule(self):
         """Delete the selected rule."""
-        selected_index = self.rules_listbox.curselection()
-        if not selected_index:
+        rule_name = self._selected_rule_name()
+        if rule_name is None:
             messagebox.showwarning("No Selection", "Please select a rule to delete")
             return
         
-        selected_text = self.rules_listbox.get(selected_index[0])
         try:
-            # Extract just the rule name part
-            rule_name = selected_text.split(" (")[0]
-            
             # Confirm deletion
             if messagebox.askyesno("Confirm Delete", f"Delete rule '{rule_name}'?"):
-                # Double check the rule exists
-                if rule_name in self.rule_manager.get_all_rules():
+                # Let the rule manager's own lookup report a missing rule
+                try:
                     self.rule_manager.remove_rule(rule_name)
-                    self.update_rules_list()
-                else:
+                except KeyError:
                     messagebox.showwarning("Error", f"Rule '{rule_name}' not found")
+                    return
+                self._invalidate_rules()
+                self._delete_row(rule_name)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to delete rule: {str(e)}")
 
@@ -1,15 +1,56 @@
 import cProfile
+import contextlib
+import dis
+import functools
 import os
 import pstats
-import io
 import importlib.util
+import linecache
 import re
 import sys
 from line_profiler import LineProfiler
-from memory_profiler import profile
 import json
+from array import array
+from collections import Counter
 from typing import Dict, List, Any, Optional
 
+# PEP 669 monitoring (Python 3.12+); call tracing falls back to settrace without it, since
+# before 3.12 cProfile occupies the profile hook
+_monitoring = getattr(sys, 'monitoring', None)
+
+# sys.monitoring tool ids our callbacks returned DISABLE for since the last restart_events(); those
+# locations stay disabled for that id, even after it is freed, so it is not reused until a restart
+_stale_tool_ids = set()
+
+# File path -> (mtime, compiled code object), shared so fresh analyzers reuse it too
+_compiled_cache = {}
+
+# Special functions ('<module>', '<listcomp>', '<built-in ...>', ...), constructors and decode helpers
+_EXCLUDED_FUNCTION_RE = re.compile(r'<|__init__|decode')
+
+
+@functools.lru_cache(maxsize=None)
+def _should_include_function(func_name: str) -> bool:
+    """
+    Determines whether this function should be included in the analysis results.
+    """
+    return _EXCLUDED_FUNCTION_RE.match(func_name) is None
+
+
+@contextlib.contextmanager
+def _running_as_main(namespace: Dict[str, Any]):
+    """
+    Temporarily renames the namespace to '__main__', so the target runs as it would as a script,
+    including its `if __name__ == "__main__":` block.
+    """
+    previous = namespace.get('__name__')
+    namespace['__name__'] = '__main__'
+    try:
+        yield namespace
+    finally:
+        namespace['__name__'] = previous
+
+
 class PerformanceAnalyzer:
     def __init__(self):
         self.profiler = cProfile.Profile()
@@ -17,8 +58,16 @@ class PerformanceAnalyzer:
         self.memory_profile_results = []
         self.target_module = None
         self.file_path = None
-        self.call_stack_data = []  # Stores call stack information
         self.current_stack = []    # Current call stack
+        self._target_filename = None  # co_filename of the target script's code; other calls are not recorded
+        # Recorded calls, one entry per call event in parallel arrays (function id, line, stack depth)
+        self._name_ids = {}        # Function name -> id
+        self._names = []           # Id -> function name
+        self._event_funcs = array('I')
+        self._event_lines = array('I')
+        self._event_depths = array('I')
+        self._monitoring_tool = None  # sys.monitoring tool id while call tracing is active
+        self._monitoring_disable = None  # What the callbacks return for other files: DISABLE, or None
 
     def load_module_from_file(self, file_path: str) -> Optional[Any]:
         """
@@ -37,6 +86,27 @@ class PerformanceAnalyzer:
             print(f"Failed to load file: {e}")
             return None
 
+    def _compile_target(self):
+        """
+        Compiles the target file, reusing the cached code object until the file's mtime changes.
+        :return: Compiled code object of the target file.
+        """
+        try:
+            mtime = os.path.getmtime(self.file_path)
+        except OSError:
+            mtime = None
+
+        cached = _compiled_cache.get(self.file_path)
+        if cached is not None and mtime is not None and cached[0] == mtime:
+            return cached[1]
+
+        # Compile from bytes so the source's own encoding declaration (or UTF-8) applies, not the locale's
+        with open(self.file_path, 'rb') as f:
+            code = compile(f.read(), self.file_path, 'exec')
+        if mtime is not None:
+            _compiled_cache[self.file_path] = (mtime, code)
+        return code
+
     def _get_functions_from_module(self) -> List[str]:
         """
         Extracts all function names from the module.
@@ -48,11 +118,12 @@ class PerformanceAnalyzer:
                 if callable(getattr(self.target_module, func)) 
                 and not func.startswith("__")]
 
-    def analyze_file(self, file_path: str, mode: str) -> Dict[str, Any]:
+    def analyze_file(self, file_path: str, mode: str, fast: bool = False) -> Dict[str, Any]:
         """
         Performs performance analysis based on the file path and mode.
         :param file_path: Path to the Python code file.
         :param mode: Analysis mode (function/line/memory).
+        :param fast: In line mode, estimate line timings from cProfile instead of running line_profiler.
         :return: Analysis results in JSON format.
         """
         module = self.load_module_from_file(file_path)
@@ -63,6 +134,8 @@ class PerformanceAnalyzer:
         if mode == "function":
             return self._analyze_function_level(module)
         elif mode == "line":
+            if fast:
+                return self._analyze_line_level_fast(module)
             return self._analyze_line_level(module)
         else:
             return {"error": "Unsupported analysis mode"}
@@ -70,91 +143,203 @@ class PerformanceAnalyzer:
     def _trace_calls(self, frame, event, arg):
         """
         Trace function to track function calls and returns for building call stack.
+        Only the depth of each call is recorded here; the full stacks are rebuilt
+        once the run is over by _collect_call_stacks.
         """
+        if frame.f_code.co_filename != self._target_filename:
+            # Not the target script (stdlib, site-packages, ...); no local tracing for this frame
+            return None
+
         if event == 'call':
-            # Get the current function information
+            # Only call/return events are needed, so skip the per-line callbacks
+            frame.f_trace_lines = False
             func_name = frame.f_code.co_name
-            file_name = frame.f_code.co_filename
-            line_number = frame.f_lineno
-            
+
             # Update the current call stack
             self.current_stack.append(func_name)
-            
+
             # Record call information
-            call_info = {
-                'function': func_name,
-                'file': file_name,
-                'line': line_number,
-                'stack': list(self.current_stack)  # Copy the current call stack
-            }
-            self.call_stack_data.append(call_info)
-            
+            func_id = self._name_ids.get(func_name)
+            if func_id is None:
+                func_id = self._intern_name(func_name)
+            self._event_funcs.append(func_id)
+            self._event_lines.append(frame.f_lineno)
+            self._event_depths.append(len(self.current_stack))
+
         elif event == 'return':
             # Update the call stack when the function returns
             func_name = frame.f_code.co_name
             if self.current_stack and self.current_stack[-1] == func_name:
                 self.current_stack.pop()
-        
+
+        # settrace needs it to keep receiving 'return' events
         return self._trace_calls
-    
-    def _calculate_call_chain_counts(self, call_stacks):
+
+    def _on_py_start(self, code, instruction_offset):
         """
-        Calculate the number of calls in the call chain.
-        
-        :param call_stacks: Call stack list containing information for each call (function name, call chain, etc.).
-        :return: Dictionary containing call chains and their occurrence counts.
+        sys.monitoring PY_START/PY_RESUME callback, the equivalent of a 'call' event.
         """
-        call_chain_counts = {}
+        if code.co_filename != self._target_filename:
+            # Stop receiving events for this location altogether, where that can be undone later
+            return self._monitoring_disable
+        func_name = code.co_name
+        self.current_stack.append(func_name)
+        func_id = self._name_ids.get(func_name)
+        if func_id is None:
+            func_id = self._intern_name(func_name)
+        self._event_funcs.append(func_id)
+        self._event_lines.append(code.co_firstlineno)
+        self._event_depths.append(len(self.current_stack))
 
-        for entry in call_stacks:
-            # Convert stack to a tuple (immutable type) to use as a dictionary key
-            call_chain = tuple(entry['stack'])
-            
-            if call_chain not in call_chain_counts:
-                call_chain_counts[call_chain] = 0
-            call_chain_counts[call_chain] += 1
+    def _on_py_return(self, code, instruction_offset, arg):
+        """
+        sys.monitoring PY_RETURN/PY_YIELD callback, the equivalent of a 'return' event.
+        """
+        if code.co_filename != self._target_filename:
+            return self._monitoring_disable
+        if self.current_stack and self.current_stack[-1] == code.co_name:
+            self.current_stack.pop()
+
+    def _on_py_unwind(self, code, instruction_offset, exception):
+        """
+        sys.monitoring PY_UNWIND callback; unwind events cannot be disabled per location.
+        """
+        if (code.co_filename == self._target_filename
+                and self.current_stack and self.current_stack[-1] == code.co_name):
+            self.current_stack.pop()
 
-        return call_chain_counts
+    def _start_call_tracing(self):
+        """
+        Starts recording calls, through sys.monitoring when a tool id is free, else through settrace.
+        """
+        if _monitoring is not None:
+            # restart_events() is interpreter-wide and would also re-arm what other tools disabled,
+            # so it is only safe while the sole other tool is cProfile, which never returns DISABLE
+            can_restart = all(_monitoring.get_tool(i) in (None, "cProfile") for i in range(6))
+            if can_restart and _stale_tool_ids:
+                # Re-arm locations disabled during previous runs, which may have had another target
+                _monitoring.restart_events()
+                _stale_tool_ids.clear()
+            # Leave DEBUGGER_ID and COVERAGE_ID to their tools, and PROFILER_ID to self.profiler
+            tool_id = next((i for i in range(_monitoring.PROFILER_ID + 1, 6)
+                            if _monitoring.get_tool(i) is None and i not in _stale_tool_ids), None)
+            if tool_id is not None:
+                events = _monitoring.events
+                _monitoring.use_tool_id(tool_id, "Py_Spy")
+                if can_restart:
+                    self._monitoring_disable = _monitoring.DISABLE
+                    _stale_tool_ids.add(tool_id)
+                else:
+                    # Without a later restart, disabled locations would miss calls in future runs
+                    self._monitoring_disable = None
+                for event in (events.PY_START, events.PY_RESUME):
+                    _monitoring.register_callback(tool_id, event, self._on_py_start)
+                for event in (events.PY_RETURN, events.PY_YIELD):
+                    _monitoring.register_callback(tool_id, event, self._on_py_return)
+                _monitoring.register_callback(tool_id, events.PY_UNWIND, self._on_py_unwind)
+                _monitoring.set_events(tool_id, events.PY_START | events.PY_RESUME | events.PY_RETURN
+                                       | events.PY_YIELD | events.PY_UNWIND)
+                self._monitoring_tool = tool_id
+                return
+        sys.settrace(self._trace_calls)
+
+    def _stop_call_tracing(self):
+        """
+        Stops recording calls and releases the sys.monitoring tool id if one was claimed.
+        """
+        tool_id = self._monitoring_tool
+        if tool_id is None:
+            sys.settrace(None)
+        else:
+            events = _monitoring.events
+            _monitoring.set_events(tool_id, events.NO_EVENTS)
+            for event in (events.PY_START, events.PY_RESUME, events.PY_RETURN, events.PY_YIELD, events.PY_UNWIND):
+                _monitoring.register_callback(tool_id, event, None)
+            _monitoring.free_tool_id(tool_id)
+            self._monitoring_tool = None
+
+    def _intern_name(self, func_name):
+        """
+        Assigns the next id to a function name seen for the first time.
+        """
+        func_id = self._name_ids[func_name] = len(self._names)
+        self._names.append(func_name)
+        return func_id
+
+    def _collect_call_stacks(self):
+        """
+        Rebuilds the call stack of every recorded call from the recorded depths,
+        keeping only the calls and stack entries of included functions, and counts
+        how often each call chain occurs along the way.
+        Identical stacks share one interned tuple, so they hash once and compare by identity.
+        :return: Tuple of the call stack list and a Counter of call chain occurrences.
+        """
+        names = self._names
+        included = [_should_include_function(name) for name in names]  # Indexed by function id
+        filtered_stacks = {}  # Stack of ids -> interned filtered stack of names
+        interned = {}
+        call_stacks = []
+        call_chain_counts = Counter()
+        stack = []
+        no_previous = previous = (None, None, None)  # (function id, depth, filtered stack) of the last call
+        for func_id, line, depth in zip(self._event_funcs, self._event_lines, self._event_depths):
+            del stack[depth - 1:]
+            stack.append(func_id)
+            if not included[func_id]:
+                previous = no_previous
+                continue
+
+            # Every push is recorded, so the same function at the same depth as the immediately
+            # preceding call (a call in a loop) sits on the same stack
+            if previous[0] == func_id and previous[1] == depth:
+                filtered_stack = previous[2]
+            else:
+                # Filter special functions from the call stack
+                key = tuple(stack)
+                filtered_stack = filtered_stacks.get(key)
+                if filtered_stack is None:
+                    filtered_stack = tuple(names[i] for i in stack if included[i])
+                    filtered_stack = filtered_stacks[key] = interned.setdefault(filtered_stack, filtered_stack)
+                previous = (func_id, depth, filtered_stack)
+            call_chain_counts[filtered_stack] += 1
+            call_stacks.append({
+                "function": names[func_id],
+                "stack": filtered_stack,
+                "line": line
+            })
+        return call_stacks, call_chain_counts
 
     def _analyze_function_level(self, module) -> Dict[str, Any]:
         """
         Function-level performance analysis.
         """
-        def should_include_function(func_name: str) -> bool:
-            """
-            Determines whether this function should be included in the analysis results.
-            """
-            # Filters out the following types of functions:
-            exclusions = [
-                '<built-in',
-                '<method',
-                '<module>',
-                '<listcomp>',
-                '__init__',
-                'decode',
-                '<'  # Filters out all special functions starting with '<'
-            ]
-            return not any(func_name.startswith(exc) for exc in exclusions)
-
         # Clear call stack data
-        self.call_stack_data = []
         self.current_stack = []
+        self._name_ids = {}
+        self._names = []
+        self._event_funcs = array('I')
+        self._event_lines = array('I')
+        self._event_depths = array('I')
         
+        # Compile before profiling starts so only the target's own code is measured
+        code = self._compile_target()
+        self._target_filename = code.co_filename
+
         # Start tracing and profiling
-        sys.settrace(self._trace_calls)
-        self.profiler.enable()
-        
-        # Execute the code
-        exec(open(self.file_path).read(), module.__dict__)
-        
-        # Stop tracing
-        self.profiler.disable()
-        sys.settrace(None)
+        with _running_as_main(module.__dict__):
+            self._start_call_tracing()
+            self.profiler.enable()
+            
+            # Execute the code
+            try:
+                exec(code, module.__dict__)
+            finally:
+                # Stop tracing, even if the script raised, so the monitoring tool id is released
+                self.profiler.disable()
+                self._stop_call_tracing()
 
-        # Parse performance data
-        stream = io.StringIO()
-        stats = pstats.Stats(self.profiler, stream=stream)
-        stats.strip_dirs().sort_stats('cumulative')
+        # Parse performance data; stats.stats is read directly, so the rows are never printed or sorted
+        stats = pstats.Stats(self.profiler)
 
         results = []
         call_chains = []
@@ -163,171 +348,135 @@ class PerformanceAnalyzer:
         function_indices = {}  # Map function names to their indices in results
         average_time_map = {}  # Map function names to their total time
         call_count_map = {}    # Map function names to their call count
+        own_time_map = {}      # Map function names to the time spent in their own body
         direct_calls = {}      # Map of direct caller-callee relationships
+        called_functions = set()  # Functions called by at least one included function
+        entry_functions = set()   # Functions called by at least one excluded caller
 
-        # First pass: collect basic function information and build direct call relationships
-        for func, (cc, nc, tt, ct, callers) in stats.stats.items():
-            _, line_number, function_name = func
-            
+        # First pass: collect basic function information and build direct call relationships.
+        # The maps are closed over by the helpers below, so bind them to plain locals for the loop.
+        include = _should_include_function
+        indices, counts, own_times, averages = function_indices, call_count_map, own_time_map, average_time_map
+        calls_by_caller, called, entries = direct_calls, called_functions, entry_functions
+        append_result = results.append
+        for (_, line_number, function_name), (cc, nc, tt, ct, callers) in stats.stats.items():
             # Add filtering condition
-            if not should_include_function(function_name):
+            if not include(function_name):
                 continue
                 
-            function_indices[function_name] = len(results)
-            call_count_map[function_name] = nc
-            average_time_map[function_name] = ct / nc if nc > 0 else 0
+            average_time = ct / nc if nc > 0 else 0
+            indices[function_name] = len(results)
+            counts[function_name] = nc
+            own_times[function_name] = tt
+            averages[function_name] = average_time
             
             # Record direct caller-callee relationships
-            for caller, caller_stats in callers.items():
-                _, _, caller_name = caller
+            for _, _, caller_name in callers:
                 # Add filtering condition
-                if not should_include_function(caller_name):
+                if not include(caller_name):
+                    # Called directly from main (or another excluded caller)
+                    entries.add(function_name)
                     continue
-                if caller_name not in direct_calls:
-                    direct_calls[caller_name] = set()
-                direct_calls[caller_name].add(function_name)
+                if caller_name not in calls_by_caller:
+                    calls_by_caller[caller_name] = set()
+                calls_by_caller[caller_name].add(function_name)
+                called.add(function_name)
             
-            results.append({
+            append_result({
                 "function": function_name,
                 "calls": nc,
                 "total_time": ct,
-                "average_time": ct / nc if nc > 0 else 0,
+                "average_time": average_time,
                 "line_number": line_number,
             })
 
-        def print_call_tree(func_name, indent=0, visited=None, chain=None):
+        # The call graph is only read from here on; freeze each callee set into a sorted tuple,
+        # which is smaller, iterates faster and gives the tree a stable order
+        direct_calls = {caller: tuple(sorted(callees)) for caller, callees in direct_calls.items()}
+
+        # self_time only depends on the function, so compute it once instead of on every path
+        self_time_map = {}
+        for func_name, average_time in average_time_map.items():
+            for callee in direct_calls.get(func_name, ()):
+                if callee in average_time_map and _should_include_function(callee):
+                    average_time -= average_time_map[callee]
+            self_time_map[func_name] = average_time
+
+        callee_cache = {}   # Function name -> (included callees, their indices in results)
+
+        def get_callees(func_name):
             """
-            Prints the function call tree.
+            Returns the included direct callees of a function and their indices.
             """
-            if visited is None:
-                visited = set()
-            if chain is None:
-                chain = []
-                
-            if func_name in visited:
-                print("  " * indent + f"└── {func_name} (recursive call)")
-                return
-                
-            visited.add(func_name)
-            chain.append(func_name)
-            
-            # Print current function
-            prefix = "  " * indent + "└── " if indent > 0 else ""
-            print(f"{prefix}{func_name}")
-            
-            # Recursively print called functions
-            callees = direct_calls.get(func_name, set())
-            for callee in callees:
-                if callee not in visited and should_include_function(callee):
-                    print_call_tree(callee, indent + 1, visited.copy(), chain.copy())
+            cached = callee_cache.get(func_name)
+            if cached is None:
+                included = tuple(callee for callee in direct_calls.get(func_name, ())
+                                 if _should_include_function(callee))
+                cached = callee_cache[func_name] = (
+                    included,
+                    tuple(function_indices[callee] for callee in included if callee in function_indices)
+                )
+            return cached
 
-        def build_call_chains(func_name, current_chain=None, visited=None):
+        def walk_call_tree(root):
             """
-            Builds the call chains.
+            Prints the function call tree below root and builds its call chains, one per path.
+            Iterative DFS: `visited` holds the functions on the current path, so recursive
+            calls are cut off without copying the chain or the set for every child.
             """
-            if visited is None:
-                visited = set()
-            if current_chain is None:
-                current_chain = []
-                
-            if func_name in visited:
-                return
-                
-            visited.add(func_name)
-            current_chain.append(func_name)
-            
-            # Get directly called functions
-            callees = direct_calls.get(func_name, set())
-            
-            # Create list of indices for current chain's children
-            children_indices = []
-            for callee in callees:
-                if callee in function_indices and should_include_function(callee):
-                    children_indices.append(function_indices[callee])
-            
-            # Calculate self_time
-            self_time = average_time_map[func_name]
-            for callee in callees:
-                if callee in average_time_map and should_include_function(callee):
-                    self_time -= average_time_map[callee]
-            
-            # Add current call chain
-            call_chains.append({
-                "chain": current_chain.copy(),
-                "count": 0,  # Updated with actual call chain counts later
-                "self_time": self_time,
-                "children": children_indices
-            })
-            
-            # Create new call chains for each called function
-            for callee in callees:
-                if callee not in visited and should_include_function(callee):
-                    build_call_chains(callee, current_chain.copy(), visited.copy())
-            
-            current_chain.pop()
-            visited.remove(func_name)
+            chain = []
+            visited = set()
+            pending = []  # One iterator over the remaining callees per function in chain
+
+            def enter(func_name):
+                indent = len(chain)
+                chain.append(func_name)
+                visited.add(func_name)
+
+                # Print current function
+                prefix = "  " * indent + "└── " if indent > 0 else ""
+                print(f"{prefix}{func_name} (calls: {call_count_map[func_name]}, "
+                      f"time: {own_time_map[func_name]:.6f}s)")
+
+                included_callees, children_indices = get_callees(func_name)
+
+                # Add current call chain
+                count = call_chain_counts[tuple(chain)]  # Counter gives 0 for unseen chains
+                call_chains.append({
+                    "chain": chain.copy(),
+                    "count": count,
+                    "percentage": count * 100.0 / total_samples,
+                    "self_time": self_time_map[func_name],
+                    "children": list(children_indices)
+                })
+                pending.append(iter(included_callees))
+
+            enter(root)
+            while pending:
+                callee = next(pending[-1], None)
+                if callee is None:
+                    pending.pop()
+                    visited.remove(chain.pop())
+                elif callee not in visited:
+                    enter(callee)
+
+        # Process and filter call stack information and calculate the number of calls
+        # in each call chain, so the tree walk can fill in the counts as it goes
+        call_stacks, call_chain_counts = self._collect_call_stacks()
+        total_samples = sum(call_chain_counts.values()) or 1
 
         # Find all root functions and build call chains
         print("\nCall Tree:")
         print("==========")
         
-        # Find all function calls that appear in the code
-        root_functions = set()
-        for func_name in function_indices:
-            if not should_include_function(func_name):
-                continue
-            # A function is a root if it's never called by others
-            # or if it's called directly in the main scope
-            is_called = False
-            for callers in direct_calls.values():
-                if func_name in callers:
-                    is_called = True
-                    break
-            
-            if not is_called:
-                root_functions.add(func_name)
-            
-        # Add functions that are called directly (even if they're also called by other functions)
-        for func, (cc, nc, tt, ct, callers) in stats.stats.items():
-            _, _, func_name = func
-            if not should_include_function(func_name):
-                continue
-            
-            # Check if this function is called directly from main
-            for caller in callers:
-                _, _, caller_name = caller
-                if not should_include_function(caller_name):
-                    root_functions.add(func_name)
-                    break
+        # A function is a root if it's never called by others
+        # or if it's called directly in the main scope (even if it's also called by other functions)
+        root_functions = (function_indices.keys() - called_functions) | entry_functions
 
         # Build and print call chains for all root functions
-        for func_name in root_functions:
-            if should_include_function(func_name):
-                print_call_tree(func_name)
-                build_call_chains(func_name)
-
-        # Process and filter call stack information
-        call_stacks = []
-        for call_info in self.call_stack_data:
-            func_name = call_info['function']
-            if should_include_function(func_name):
-                # Filter special functions from the call stack
-                filtered_stack = [f for f in call_info['stack'] if should_include_function(f)]
-                if filtered_stack:  # Add only if the filtered call stack is not empty
-                    call_stacks.append({
-                        "function": func_name,
-                        "stack": filtered_stack,
-                        "line": call_info['line']
-                    })
-        
-        # Calculate the number of calls in the call chain
-        call_chain_counts = self._calculate_call_chain_counts(call_stacks)
-        
-        # Update the count field in call_chains
-        for call_chain in call_chains:
-            chain_tuple = tuple(call_chain["chain"])
-            if chain_tuple in call_chain_counts:
-                call_chain["count"] = call_chain_counts[chain_tuple]
+        for func_name in sorted(root_functions):
+            if _should_include_function(func_name):
+                walk_call_tree(func_name)
 
         return {
             "mode": "function",
@@ -376,9 +525,11 @@ class PerformanceAnalyzer:
         # If no functions are found, try executing the file's content directly
         if not functions:
             # Execute the file's content
-            self.line_profiler.enable()
-            exec(open(self.file_path).read(), self.target_module.__dict__)
-            self.line_profiler.disable()
+            code = self._compile_target()
+            with _running_as_main(self.target_module.__dict__):
+                self.line_profiler.enable()
+                exec(code, self.target_module.__dict__)
+                self.line_profiler.disable()
         else:
             # Execute each function
             self.line_profiler.enable()
@@ -392,47 +543,22 @@ class PerformanceAnalyzer:
                     pass
             self.line_profiler.disable()
         
-        # Collect analysis results
-        import io
-        output = io.StringIO()
-        self.line_profiler.print_stats(stream=output)
-        
-        # Parse the output results
+        # Collect analysis results straight from the raw timings instead of parsing print_stats output
+        line_stats = self.line_profiler.get_stats()
+        unit = line_stats.unit
         results = []
-        lines = output.getvalue().split('\n')
-        
-        # Skip the header information and parse statistical data line by line
-        current_function = None
-        for line in lines:
-            # Detect function name lines
-            if line.strip().startswith('Function'):
-                current_function = line.split("Function: ")[1].split(" at ")[0].strip()
-                continue
-            
-            # Parse statistical data lines
-            if re.match(r'\s+\d+', line):
-                parts = line.strip().split()
-                if len(parts) >= 6:
-                    try:
-                        line_num = int(parts[0])
-                        hits = int(parts[1])
-                        time = float(parts[2]) * 1e-09
-                        per_hit = float(parts[3]) * 1e-09
-                        percent = float(parts[4].strip('%'))
-                        code = ' '.join(parts[5:])
-                        
-                        results.append({
-                            "line_number": line_num,
-                            "hits": hits,
-                            "total_time": time,
-                            "per_hit": per_hit,
-                            "percent_time": percent,
-                            "code": code,
-                            "function": current_function
-                        })
-                    except (ValueError, IndexError):
-                        # Skip lines that cannot be parsed
-                        pass
+        for (filename, _, function_name), timings in line_stats.timings.items():
+            function_time = sum(time for _, _, time in timings)
+            for line_num, hits, time in sorted(timings):
+                results.append({
+                    "line_number": line_num,
+                    "hits": hits,
+                    "total_time": time * unit,
+                    "per_hit": time * unit / hits if hits else 0,
+                    "percent_time": 100 * time / function_time if function_time else 0,
+                    "code": linecache.getline(filename, line_num).strip(),
+                    "function": function_name
+                })
         
         # Return the analysis results
         return {
@@ -441,6 +567,90 @@ class PerformanceAnalyzer:
             "results": results
         }
 
+    def _analyze_line_level_fast(self, module=None, threshold: float = 0.0):
+        """
+        Estimate line-level performance from function-level profiling.
+
+        The functions are run the same way as in _analyze_line_level, but under cProfile,
+        which is far cheaper than line_profiler's per-line tracing. The cumulative time of
+        each function above the threshold is then spread over its lines in proportion to
+        the number of bytecode instructions each line compiles to, and every line is
+        counted as hit once per call. Treat the numbers as a quick preview; run
+        _analyze_line_level for exact per-line timings.
+
+        Args:
+            module: The loaded Python module object.
+            threshold: Functions with a cumulative time at or below this (in seconds) are skipped.
+
+        Returns:
+            dict: Results in the same format as _analyze_line_level, plus "estimated": True.
+        """
+        functions = self._get_functions_from_module()
+        profiler = cProfile.Profile()
+
+        # Execute the file's content or each function, as _analyze_line_level does
+        if not functions:
+            code = self._compile_target()
+            with _running_as_main(self.target_module.__dict__):
+                profiler.enable()
+                exec(code, self.target_module.__dict__)
+                profiler.disable()
+        else:
+            profiler.enable()
+            for func_name in functions:
+                try:
+                    func = getattr(self.target_module, func_name)
+                    if callable(func):
+                        func()
+                except Exception:
+                    # Ignore execution errors and continue analyzing other functions
+                    pass
+            profiler.disable()
+
+        stats = pstats.Stats(profiler).stats
+        results = []
+        for func_name in functions:
+            code = getattr(getattr(self.target_module, func_name), "__code__", None)
+            if code is None:
+                continue
+            row = stats.get((code.co_filename, code.co_firstlineno, code.co_name))
+            if row is None or row[3] <= threshold:
+                continue
+            _, nc, _, ct, _ = row
+
+            # Instructions per line: each one belongs to the most recent line start. get_instructions
+            # skips the inline CACHE entries that co_code carries from 3.11 on
+            instructions = Counter()
+            line_starts = dict(dis.findlinestarts(code))
+            line = None
+            for instruction in dis.get_instructions(code):
+                line = line_starts.get(instruction.offset, line)
+                # The def line only carries the frame setup, which line_profiler never reports either
+                if line is not None and line != code.co_firstlineno:
+                    instructions[line] += 1
+            total_instructions = sum(instructions.values())
+            if not total_instructions:
+                continue
+
+            for line_num in sorted(instructions):
+                share = instructions[line_num] / total_instructions
+                results.append({
+                    "line_number": line_num,
+                    "hits": nc,
+                    "total_time": ct * share,
+                    "per_hit": ct * share / nc if nc else 0,
+                    "percent_time": 100 * share,
+                    "code": linecache.getline(code.co_filename, line_num).strip(),
+                    "function": func_name
+                })
+
+        return {
+            "mode": "line",
+            "file": self.file_path,
+            "results": results,
+            "estimated": True
+        }
+
 
 # Test code
 if __name__ == "__main__":
@@ -1,21 +1,25 @@
 import ast
-from typing import Dict, List, Any, Optional
+import functools
+from typing import Dict, Iterator, List, Any, Optional, get_args, get_origin
 
 # Build an initial optimization rule library with detailed modification suggestions
 OPTIMIZATION_RULES = {
     "loop_optimization": {
         "description": "Avoid unnecessary calculations inside loops. Move invariant calculations outside the loop.",
         "check": lambda node: isinstance(node, ast.For) or isinstance(node, ast.While),
+        "node_types": (ast.For, ast.While),
         "suggestion": "If there are calculations that don't depend on the loop variable, move them outside the loop. For example, if you have a constant value calculation like 'result = 2 + 3' inside a loop, move it before the loop."
     },
     "redundant_calculation": {
         "description": "Avoid redundant calculations. If a value is calculated multiple times with the same input, consider caching it.",
         "check": lambda node: isinstance(node, ast.BinOp) and isinstance(getattr(node, 'parent', None), ast.For),
+        "node_types": (ast.BinOp,),
         "suggestion": "Identify calculations that are repeated with the same input. You can store the result of the first calculation in a variable and reuse it instead of recalculating. For example, if you have 'result = 2 + 3' multiple times, calculate it once and reuse the variable."
     },
     "cache_suggestion": {
         "description": "Consider using caching for functions with expensive calculations. You can use functools.lru_cache for simple cases.",
         "check": lambda node: isinstance(node, ast.FunctionDef),
+        "node_types": (ast.FunctionDef,),
         "suggestion": "If the function performs expensive calculations and the same input is likely to be used multiple times, you can use the 'functools.lru_cache' decorator. For example, add '@functools.lru_cache(maxsize=128)' above the function definition."
     },
     "function_call_optimization": {
@@ -36,83 +40,159 @@ OPTIMIZATION_RULES = {
 }
 
 
+def _index_ast_rules(rules: Dict[str, Dict[str, Any]]) -> Dict[type, List[tuple]]:
+    """
+    Group the AST-based rules by the node classes they apply to
+    :param rules: Rule library; AST-based rules list their node classes under "node_types"
+    :return: Mapping from node class to its (rule name, rule) pairs
+    """
+    rules_by_type = {}
+    for rule_name, rule in rules.items():
+        for node_type in rule.get("node_types", ()):
+            rules_by_type.setdefault(node_type, []).append((rule_name, rule))
+    return rules_by_type
+
+
+# Built once at import so each visited node only runs the checks for its own class
+_AST_RULES_BY_TYPE = _index_ast_rules(OPTIMIZATION_RULES)
+
+@functools.lru_cache(maxsize=None)
+def _child_fields(node_type: type) -> tuple:
+    """
+    Classify the fields of a node class once, from the field types it declares (Python 3.13+)
+    :param node_type: AST node class
+    :return: (field, is_list) pairs for the fields that can hold nodes; is_list is None where the
+             type is not declared, so the walker checks the value instead. Scalar fields are left out
+    """
+    field_types = getattr(node_type, '_field_types', {})
+    fields = []
+    for field in node_type._fields:
+        annotation = field_types.get(field, object)
+        if annotation is object:
+            fields.append((field, None))
+            continue
+        is_list = get_origin(annotation) is list
+        # Element type of list[...], or the members of an "expr | None" union
+        parts = get_args(annotation) or (annotation,)
+        if any(isinstance(part, type) and issubclass(part, ast.AST) for part in parts):
+            fields.append((field, is_list))
+    return tuple(fields)
+
+
+@functools.lru_cache(maxsize=None)
+def _is_leaf(node_type: type) -> bool:
+    """
+    Whether visiting a node class can be skipped: it has no fields and no rules apply to it
+    (e.g. Load, Store and the operator nodes, which make up about a third of a typical tree)
+    :param node_type: AST node class
+    :return: True if nodes of this class never produce suggestions
+    """
+    return not node_type._fields and node_type not in _AST_RULES_BY_TYPE
+
+
 class ASTVisitor(ast.NodeVisitor):
     def __init__(self):
         self.suggestions = []
         self.parent = None
 
     def generic_visit(self, node):
-        # Set the parent node of the current node
+        """
+        Walk the subtree below node in source order with an explicit stack instead of
+        recursing once per node, so deeply nested code cannot hit the recursion limit
+        """
         old_parent = self.parent
-        self.parent = node
-        for rule_name, rule in OPTIMIZATION_RULES.items():
-            if rule_name in ["loop_optimization", "redundant_calculation", "cache_suggestion"] and rule["check"](node):
-                self.suggestions.append({
-                    "rule": rule_name,
-                    "description": rule["description"],
-                    "suggestion": rule["suggestion"],
-                    "line": node.lineno if hasattr(node, 'lineno') else None
-                })
-        super().generic_visit(node)
+        append = self.suggestions.append
+        rules_for = _AST_RULES_BY_TYPE.get
+        child_fields = _child_fields
+        is_leaf = _is_leaf
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            node_type = type(node)
+            # Set the parent node of the current node
+            self.parent = node
+            for rule_name, rule in rules_for(node_type, ()):
+                if rule["check"](node):
+                    append({
+                        "rule": rule_name,
+                        "description": rule["description"],
+                        "suggestion": rule["suggestion"],
+                        "line": getattr(node, 'lineno', None)
+                    })
+
+            # Push the children reversed, so they are popped in field order; leaves are never pushed
+            children = []
+            for field, is_list in child_fields(node_type):
+                value = getattr(node, field, None)
+                if is_list or (is_list is None and isinstance(value, list)):
+                    children.extend(item for item in value
+                                    if isinstance(item, ast.AST) and not is_leaf(type(item)))
+                elif isinstance(value, ast.AST) and not is_leaf(type(value)):
+                    children.append(value)
+            stack.extend(reversed(children))
         self.parent = old_parent
 
 
-def generate_optimization_suggestions(code: str, analysis_results: Dict[str, Any]) -> List[Dict[str, Any]]:
+# Analysis mode -> (rule applied to its results, (suggestion key, result field) pairs to copy)
+_ANALYSIS_RULES = {
+    "function": ("function_call_optimization", (("function", "function"), ("line", "line_number"))),
+    "line": ("line_optimization", (("line", "line_number"), ("function", "function"))),
+    "memory": ("memory_optimization", (("function", "function"),)),
+}
+
+
+@functools.lru_cache(maxsize=32)
+def _ast_suggestions(code: str) -> tuple:
     """
-    Generate optimization suggestions
+    Run the AST-based rules over source code, reusing the result when the same source is analyzed again
+    :param code: The Python code to be analyzed
+    :return: The AST suggestions; shared between callers, so they must be copied before being handed out
+    """
+    visitor = ASTVisitor()
+    visitor.visit(ast.parse(code))
+    return tuple(visitor.suggestions)
+
+
+def iter_optimization_suggestions(code: str, analysis_results: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Generate optimization suggestions one at a time, without building the whole list
     :param code: The Python code to be analyzed
     :param analysis_results: Performance analysis results generated by the first set of code
-    :return: List of optimization suggestions
+    :return: Iterator over the optimization suggestions
     """
-    suggestions = []
     try:
-        # AST analysis
-        tree = ast.parse(code)
-        visitor = ASTVisitor()
-        visitor.visit(tree)
-        suggestions.extend(visitor.suggestions)
-
-        # Generate suggestions based on function-level analysis results
-        if "function" in analysis_results:
-            func_results = analysis_results["function"]["results"]
-            for func_stats in func_results:
-                for rule_name, rule in OPTIMIZATION_RULES.items():
-                    if rule_name == "function_call_optimization" and rule["check"](func_stats):
-                        suggestions.append({
-                            "rule": rule_name,
-                            "description": rule["description"],
-                            "suggestion": rule["suggestion"],
-                            "function": func_stats["function"],
-                            "line": func_stats["line_number"]
-                        })
-
-        # Generate suggestions based on line-by-line analysis results
-        if "line" in analysis_results:
-            line_results = analysis_results["line"]["results"]
-            for line_stats in line_results:
-                for rule_name, rule in OPTIMIZATION_RULES.items():
-                    if rule_name == "line_optimization" and rule["check"](line_stats):
-                        suggestions.append({
-                            "rule": rule_name,
-                            "description": rule["description"],
-                            "suggestion": rule["suggestion"],
-                            "line": line_stats["line_number"],
-                            "function": line_stats["function"]
-                        })
-
-        # Generate suggestions based on memory analysis results
-        if "memory" in analysis_results:
-            mem_results = analysis_results["memory"]["results"]
-            for mem_stats in mem_results:
-                for rule_name, rule in OPTIMIZATION_RULES.items():
-                    if rule_name == "memory_optimization" and rule["check"](mem_stats):
-                        suggestions.append({
-                            "rule": rule_name,
-                            "description": rule["description"],
-                            "suggestion": rule["suggestion"],
-                            "function": mem_stats["function"]
-                        })
-
+        # AST analysis; the rules are fixed at import, so the result only depends on the code
+        ast_suggestions = _ast_suggestions(code)
     except SyntaxError as e:
         print(f"Syntax error in code: {e}")
-    return suggestions
+        return
+    for suggestion in ast_suggestions:
+        yield dict(suggestion)
+
+    # Generate suggestions from the function-level, line-by-line and memory analysis results
+    seen = set()
+    for mode, (rule_name, fields) in _ANALYSIS_RULES.items():
+        if mode not in analysis_results:
+            continue
+        rule = OPTIMIZATION_RULES[rule_name]
+        check, description, suggestion = rule["check"], rule["description"], rule["suggestion"]
+        for stats in analysis_results[mode]["results"]:
+            if check(stats):
+                item = {"rule": rule_name, "description": description, "suggestion": suggestion}
+                for key, field in fields:
+                    item[key] = stats[field]
+                # Rows of the same function (e.g. its memory lines) would repeat one suggestion
+                identity = (rule_name, item.get("function"), item.get("line"))
+                if identity not in seen:
+                    seen.add(identity)
+                    yield item
+
+
+def generate_optimization_suggestions(code: str, analysis_results: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Generate optimization suggestions
+    :param code: The Python code to be analyzed
+    :param analysis_results: Performance analysis results generated by the first set of code
+    :return: List of optimization suggestions
+    """
+    return list(iter_optimization_suggestions(code, analysis_results))
@@ -32,44 +32,29 @@ def test_load_module_from_file_success(mock_module_from_spec, mock_spec_from_fil
     assert analyzer.file_path == "test_load_module.py"
 
 
-@patch("importlib.util.spec_from_file_location")
-def test_load_module_from_file_spec_not_found_error(mock_spec_from_file_location, analyzer):
-    mock_spec_from_file_location.return_value = None
-    result = analyzer.load_module_from_file("nonexistent.py")
-    assert result is None
-    assert analyzer.target_module is None
-    assert analyzer.file_path is None
-
+def _spec_with_failing_loader(name, location):
+    spec = MagicMock()
+    spec.loader.exec_module.side_effect = SyntaxError("Simulated syntax error")
+    return spec
 
-@patch("importlib.util.spec_from_file_location")
-@patch("importlib.util.module_from_spec")
-@patch("builtins.print")
-def test_load_module_from_file_module_execution_failure(mock_print, mock_module_from_spec,
-                                                        mock_spec_from_file_location, analyzer):
-    mock_spec = MagicMock()
-    mock_loader = MagicMock()
-    mock_spec.loader = mock_loader
-    mock_spec_from_file_location.return_value = mock_spec
-    error_msg = "Simulated syntax error"
-    mock_loader.exec_module.side_effect = SyntaxError(error_msg)
-    mock_module = MagicMock()
-    mock_module_from_spec.return_value = mock_module
 
-    result = analyzer.load_module_from_file("invalid_module.py")
-    assert result is None
-    assert analyzer.target_module is None
-    assert analyzer.file_path is None
-    mock_print.assert_called_once_with(f"Failed to load file: {error_msg}")
+def _raise_permission_error(name, location):
+    raise PermissionError("Access denied")
 
 
-@patch("importlib.util.spec_from_file_location")
-@patch("builtins.print")
-def test_load_module_from_file_general_exception_handling(mock_print, mock_spec_from_file_location, analyzer):
-    mock_spec_from_file_location.side_effect = PermissionError("Access denied")
-    result = analyzer.load_module_from_file("unexpected_error.py")
+@pytest.mark.parametrize("spec_from_file_location, expected_output", [
+    (lambda name, location: None, "Failed to load file: 'NoneType' object has no attribute 'loader'"),
+    (_spec_with_failing_loader, "Failed to load file: Simulated syntax error"),
+    (_raise_permission_error, "Failed to load file: Access denied"),
+], ids=["spec_not_found", "module_execution_failure", "general_exception"])
+def test_load_module_from_file_errors(spec_from_file_location, expected_output, analyzer, monkeypatch, capsys):
+    monkeypatch.setattr("importlib.util.spec_from_file_location", spec_from_file_location)
+    result = analyzer.load_module_from_file("broken_module.py")
 
     assert result is None
-    mock_print.assert_called_once_with("Failed to load file: Access denied")
+    assert analyzer.target_module is None
+    assert analyzer.file_path is None
+    assert capsys.readouterr().out == f"{expected_output}\n"
 
 
 def test_load_module_from_file_module_real(analyzer):
@@ -95,158 +80,160 @@ def test_standard_functions(analyzer):
 
     analyzer.target_module = mock_module
     result = analyzer._get_functions_from_module()
-    assert set(result) is not None
-    assert "__init__" not in set(result)
-    assert "__private" not in set(result)
-    assert set(result) == {'func1', 'func2', '_helper'}
+    assert sorted(result) == ['_helper', 'func1', 'func2']
 
 
 @pytest.fixture
-def test_analyzer():
+def test_analyzer(tmp_path):
+    # A real file holds the executed source, so the analyzer reads it without patching open
+    source_file = tmp_path / "test_module.py"
+    source_file.write_text("print('test')")
     analyzer = PerformanceAnalyzer()
-    analyzer.file_path = "test_module.py"
+    analyzer.file_path = str(source_file)
     mock_module = types.ModuleType("test_module")
     mock_module.__file__ = "test_module.py"
     analyzer.target_module = mock_module
     return analyzer
 
 
-class TestAnalyzeFunctionLevel:
-
-    @patch("cProfile.Profile")
-    @patch("pstats.Stats")
-    @patch("builtins.open", new_callable=mock_open, read_data="print('test')")
-    def test_basic_function_analysis(self, mock_open_file, mock_pstats, mock_profile, test_analyzer):
-        mock_pstats_instance = MagicMock()
-        mock_pstats.return_value = mock_pstats_instance
-        mock_pstats_instance.stats = {
-            ('~', 0, '<built-in method time.sleep>'): (12, 12, 1.834176333, 1.834176333,
-                                                       {('test_module.py', 4, 'task_alpha'): (
-                                                           2, 2, 0.6056140830000001, 0.6056140830000001),
-                                                           ('test_module.py', 10, 'beta_worker'): (
-                                                               2, 2, 0.40229445900000005, 0.40229445900000005),
-                                                           ('test_module.py', 15, 'gamma_processor'): (
-                                                               3, 3, 0.46218887500000005, 0.46218887500000005),
-                                                           ('test_module.py', 20, 'delta_engine'): (
-                                                               2, 2, 0.20709337400000002, 0.20709337400000002),
-                                                           ('test_module.py', 25, 'epsilon_helper'): (
-                                                               3, 3, 0.156985542, 0.156985542)}),
-            ('test_module.py', 4, 'task_alpha'): (2, 2, 8.545800000000001e-05, 1.632308708,
-                                                  {('test_module.py', 1, '<module>'): (
-                                                      2, 2, 8.545800000000001e-05, 1.632308708)}),
-            ('test_module.py', 10, 'beta_worker'): (2, 2, 3.0166000000000002e-05, 0.609456917,
-                                                    {('test_module.py', 4, 'task_alpha'): (
-                                                        2, 2, 3.0166000000000002e-05, 0.609456917)}),
-            ('test_module.py', 15, 'gamma_processor'): (3, 3, 0.00010287500000000001, 0.619812584,
-                                                        {('test_module.py', 1, '<module>'): (
-                                                            1, 1, 1.1375e-05, 0.20266033400000003),
-                                                            ('test_module.py', 4, 'task_alpha'): (
-                                                                2, 2, 9.15e-05, 0.41715225)}),
-            ('test_module.py', 20, 'delta_engine'): (2, 2, 2.3876000000000003e-05, 0.20713229200000002, {
-                ('test_module.py', 10, 'beta_worker'): (2, 2, 2.3876000000000003e-05, 0.20713229200000002)}),
-            ('test_module.py', 27, '<listcomp>'): (3, 3, 0.00042495900000000004, 0.00042495900000000004, {
-                ('test_module.py', 25, 'epsilon_helper'): (3, 3, 0.00042495900000000004, 0.00042495900000000004)}),
-            ('test_module.py', 25, 'epsilon_helper'): (
-                3, 3, 0.000110333, 0.157520834,
-                {('test_module.py', 15, 'gamma_processor'): (3, 3, 0.000110333, 0.157520834)}),
-            ('test_module.py', 1, '<module>'): (1, 1, 2.1833000000000003e-05, 1.8349908750000001, {})
-        }
-
-        result = test_analyzer._analyze_function_level(test_analyzer.target_module)
-        assert result["mode"] == "function"
-        assert result["file"] == "test_module.py"
-        assert isinstance(result["results"], list)
-        assert len(result["results"]) == 5
-        result_names = [r["function"] for r in result["results"]]
-        assert "task_alpha" in result_names
-        assert "gamma_processor" in result_names
-        assert "epsilon_helper" in result_names
-        assert "<built-in method time.sleep>" not in result_names
-        assert "listcomp_func" not in result_names
-
-        func_alpha_data = next(r for r in result["results"] if r["function"] == "task_alpha")
-        assert func_alpha_data["calls"] == 2
-        assert func_alpha_data["line_number"] == 4
-
-        func_beta_data = next(r for r in result["results"] if r["function"] == "beta_worker")
-        assert func_beta_data["calls"] == 2
-        assert math.isclose(func_beta_data["total_time"], 0.609456917)
-        assert math.isclose(func_beta_data["average_time"], 0.3047284585)
-        assert func_beta_data["line_number"] == 10
-
-        func_gamma_data = next(r for r in result["results"] if r["function"] == "gamma_processor")
-        assert func_gamma_data["calls"] == 3
-        assert math.isclose(func_gamma_data["total_time"], 0.619812584)
-        assert func_gamma_data["line_number"] == 15
-
-        assert isinstance(result["call_chains"], list)
-        assert len(result["call_chains"]) > 0
-        assert any("task_alpha" in str(caller) for caller in result["call_chains"])
-        assert any("delta_engine" in str(caller) for caller in result["call_chains"])
-        assert any("epsilon_helper" in str(caller) for caller in result["call_chains"])
-        assert any("<listcomp>" not in str(caller) for caller in result["call_chains"])
-
-    @patch("cProfile.Profile")
-    @patch("pstats.Stats")
-    @patch("builtins.open", new_callable=mock_open, read_data="print('test')")
-    def test_time_calculation_accuracy(self, mock_open_file, mock_pstats, mock_profile, test_analyzer):
-        test_stats = {
-            ("time_test.py", 10, "time_func"): (3, 4, 1.2, 2.4, {})
-        }
-        mock_pstats_instance = MagicMock()
-        mock_pstats.return_value = mock_pstats_instance
-        mock_pstats_instance.stats = test_stats
-
-        result = test_analyzer._analyze_function_level(test_analyzer.target_module)
-        func_data = result["results"][0]
-        assert func_data["total_time"] == 2.4
-        assert func_data["average_time"] == 2.4 / 4
-        assert func_data["function"] == "time_func"
-        assert func_data["line_number"] == 10
-
-    @patch("cProfile.Profile")
-    @patch("pstats.Stats")
-    @patch("builtins.open", new_callable=mock_open, read_data="print('test')")
-    def test_call_chain_generation(self, mock_open_file, mock_pstats, mock_profile, test_analyzer):
-        mock_pstats_instance = MagicMock()
-        mock_pstats.return_value = mock_pstats_instance
-        mock_pstats_instance.stats = {
-            ("main.py", 10, "deep_help"): (2, 2, 0.2, 0.1, {
-                ("main.py", 5, "helper"): (2, 2, 0.8, 0.5,)
-            }),
-            ("main.py", 5, "helper"): (2, 2, 0.8, 0.5, {
-                ("main.py", 4, "root_func"): (1, 1, 1, 1.6)
-            }),
-            ("main.py", 4, "root_func"): (1, 1, 1, 1.5, {})
-        }
-        result = test_analyzer._analyze_function_level(test_analyzer.target_module)
-        root_chain = next(chain for chain in result["call_chains"] if chain["chain"] == ["root_func"])
-        help_chain = next(chain for chain in result["call_chains"] if chain["chain"] == ["root_func", "helper"])
-        assert root_chain["children"] == [1]
-        assert help_chain["self_time"] == (0.5 - 0.1) / 2
-
-    @patch("cProfile.Profile")
-    @patch("pstats.Stats")
-    @patch("builtins.open", new_callable=mock_open, read_data="print('test')")
-    @patch("builtins.print")
-    def test_call_tree_printing(self, mock_print, mock_open_file, mock_pstats, mock_profile, test_analyzer):
-        mock_pstats_instance = MagicMock()
-        mock_pstats.return_value = mock_pstats_instance
-        mock_pstats_instance.stats = {
-            ("test_module.py", 5, "child_func"): (1, 1, 0.2, 0.2, {
-                ("test_module.py", 10, "parent_func"): (1, 1, 0.2, 0.4)
-            }),
-            ("test_module.py", 10, "parent_func"): (1, 2, 0.4, 0.8, {})
-        }
-
-        test_analyzer._analyze_function_level(test_analyzer.target_module)
-        expected_calls = [
-            call("\nCall Tree:"),
-            call("=========="),
-            call("parent_func (calls: 2, time: 0.400000s)"),
-            call("  └── child_func (calls: 1, time: 0.200000s)")
-        ]
-        mock_print.assert_has_calls(expected_calls, any_order=False)
+@pytest.fixture
+def profiler_mocks():
+    with patch("cProfile.Profile") as mock_profile, patch("pstats.Stats") as mock_pstats:
+        yield types.SimpleNamespace(profile=mock_profile, stats=mock_pstats)
+
+
+# pstats rows fed to _analyze_function_level, which only reads them, so they are built once per module
+_BASIC_STATS = {
+    ('~', 0, '<built-in method time.sleep>'): (12, 12, 1.834176333, 1.834176333,
+                                               {('test_module.py', 4, 'task_alpha'): (
+                                                   2, 2, 0.6056140830000001, 0.6056140830000001),
+                                                   ('test_module.py', 10, 'beta_worker'): (
+                                                       2, 2, 0.40229445900000005, 0.40229445900000005),
+                                                   ('test_module.py', 15, 'gamma_processor'): (
+                                                       3, 3, 0.46218887500000005, 0.46218887500000005),
+                                                   ('test_module.py', 20, 'delta_engine'): (
+                                                       2, 2, 0.20709337400000002, 0.20709337400000002),
+                                                   ('test_module.py', 25, 'epsilon_helper'): (
+                                                       3, 3, 0.156985542, 0.156985542)}),
+    ('test_module.py', 4, 'task_alpha'): (2, 2, 8.545800000000001e-05, 1.632308708,
+                                          {('test_module.py', 1, '<module>'): (
+                                              2, 2, 8.545800000000001e-05, 1.632308708)}),
+    ('test_module.py', 10, 'beta_worker'): (2, 2, 3.0166000000000002e-05, 0.609456917,
+                                            {('test_module.py', 4, 'task_alpha'): (
+                                                2, 2, 3.0166000000000002e-05, 0.609456917)}),
+    ('test_module.py', 15, 'gamma_processor'): (3, 3, 0.00010287500000000001, 0.619812584,
+                                                {('test_module.py', 1, '<module>'): (
+                                                    1, 1, 1.1375e-05, 0.20266033400000003),
+                                                    ('test_module.py', 4, 'task_alpha'): (
+                                                        2, 2, 9.15e-05, 0.41715225)}),
+    ('test_module.py', 20, 'delta_engine'): (2, 2, 2.3876000000000003e-05, 0.20713229200000002, {
+        ('test_module.py', 10, 'beta_worker'): (2, 2, 2.3876000000000003e-05, 0.20713229200000002)}),
+    ('test_module.py', 27, '<listcomp>'): (3, 3, 0.00042495900000000004, 0.00042495900000000004, {
+        ('test_module.py', 25, 'epsilon_helper'): (3, 3, 0.00042495900000000004, 0.00042495900000000004)}),
+    ('test_module.py', 25, 'epsilon_helper'): (
+        3, 3, 0.000110333, 0.157520834,
+        {('test_module.py', 15, 'gamma_processor'): (3, 3, 0.000110333, 0.157520834)}),
+    ('test_module.py', 1, '<module>'): (1, 1, 2.1833000000000003e-05, 1.8349908750000001, {})
+}
+
+_TIME_STATS = {
+    ("time_test.py", 10, "time_func"): (3, 4, 1.2, 2.4, {})
+}
+
+_CHAIN_STATS = {
+    ("main.py", 10, "deep_help"): (2, 2, 0.2, 0.1, {
+        ("main.py", 5, "helper"): (2, 2, 0.8, 0.5,)
+    }),
+    ("main.py", 5, "helper"): (2, 2, 0.8, 0.5, {
+        ("main.py", 4, "root_func"): (1, 1, 1, 1.6)
+    }),
+    ("main.py", 4, "root_func"): (1, 1, 1, 1.5, {})
+}
+
+_TREE_STATS = {
+    ("test_module.py", 5, "child_func"): (1, 1, 0.2, 0.2, {
+        ("test_module.py", 10, "parent_func"): (1, 1, 0.2, 0.4)
+    }),
+    ("test_module.py", 10, "parent_func"): (1, 2, 0.4, 0.8, {})
+}
+
+# (calls, total_time, average_time, line_number) of beta_worker in _BASIC_STATS
+_EXPECTED_BETA = (2, 0.609456917, 0.609456917 / 2, 10)
+
+
+def test_basic_function_analysis(test_analyzer, profiler_mocks):
+    profiler_mocks.stats.return_value.stats = _BASIC_STATS
+
+    result = test_analyzer._analyze_function_level(test_analyzer.target_module)
+    assert result["mode"] == "function"
+    assert result["file"] == "test_module.py"
+    assert isinstance(result["results"], list)
+    assert len(result["results"]) == 5
+    by_name = {r["function"]: r for r in result["results"]}
+    result_names = list(by_name)
+    assert "task_alpha" in result_names
+    assert "gamma_processor" in result_names
+    assert "epsilon_helper" in result_names
+    assert "<built-in method time.sleep>" not in result_names
+    assert "listcomp_func" not in result_names
+
+    func_alpha_data = by_name["task_alpha"]
+    assert func_alpha_data["calls"] == 2
+    assert func_alpha_data["line_number"] == 4
+
+    # Totals are copied from the pstats rows and averages divide them by the call count, so they are exact
+    func_beta_data = by_name["beta_worker"]
+    assert (func_beta_data["calls"], func_beta_data["total_time"],
+            func_beta_data["average_time"], func_beta_data["line_number"]) == _EXPECTED_BETA
+
+    func_gamma_data = by_name["gamma_processor"]
+    assert (func_gamma_data["calls"], func_gamma_data["total_time"],
+            func_gamma_data["line_number"]) == (3, 0.619812584, 15)
+
+    assert isinstance(result["call_chains"], list)
+    assert len(result["call_chains"]) > 0
+    str_chains = [str(caller) for caller in result["call_chains"]]
+    joined = "\n".join(str_chains)
+    assert "task_alpha" in joined
+    assert "delta_engine" in joined
+    assert "epsilon_helper" in joined
+    assert all("<listcomp>" not in chain for chain in str_chains)
+
+
+def test_time_calculation_accuracy(test_analyzer, profiler_mocks):
+    profiler_mocks.stats.return_value.stats = _TIME_STATS
+
+    result = test_analyzer._analyze_function_level(test_analyzer.target_module)
+    func_data = result["results"][0]
+    assert func_data["total_time"] == 2.4
+    assert func_data["average_time"] == 2.4 / 4
+    assert func_data["function"] == "time_func"
+    assert func_data["line_number"] == 10
+
+
+def test_call_chain_generation(test_analyzer, profiler_mocks):
+    profiler_mocks.stats.return_value.stats = _CHAIN_STATS
+    result = test_analyzer._analyze_function_level(test_analyzer.target_module)
+    chains_by_tuple = {tuple(chain["chain"]): chain for chain in result["call_chains"]}
+    root_chain = chains_by_tuple[("root_func",)]
+    help_chain = chains_by_tuple[("root_func", "helper")]
+    assert root_chain["children"] == [1]
+    assert help_chain["self_time"] == (0.5 - 0.1) / 2
+    # Nothing was traced, so no chain takes a share of the samples
+    assert root_chain["percentage"] == 0
+
+
+def test_call_tree_printing(test_analyzer, profiler_mocks, capsys):
+    profiler_mocks.stats.return_value.stats = _TREE_STATS
+
+    test_analyzer._analyze_function_level(test_analyzer.target_module)
+    expected_output = (
+        "\nCall Tree:\n"
+        "==========\n"
+        "parent_func (calls: 2, time: 0.400000s)\n"
+        "  └── child_func (calls: 1, time: 0.200000s)\n"
+    )
+    assert expected_output in capsys.readouterr().out
 
 
 def _create_mock_module(functions, file_content="", filename="test.py"):
@@ -303,6 +290,7 @@ class TestAnalyzeLineLevel:
         mock_target_module.__file__ = "empty.py"
         mock_target_module.func = None
         file_content = ""
+        self.analyzer.file_path = "empty.py"
 
         with patch("importlib.util.spec_from_file_location"), \
                 patch("importlib.util.module_from_spec"), \
@@ -313,38 +301,30 @@ class TestAnalyzeLineLevel:
             assert isinstance(result["results"], list)
             assert result["results"] == []
 
-    def test_analyze_line_level_output_parsing(self):
+    def test_analyze_line_level_output_parsing(self, tmp_path):
         mock_target_module = types.ModuleType("mock_module")
         mock_target_module.__file__ = "test.py"
         mock_func = MagicMock(__name__="my_function")
         mock_target_module.func1 = mock_func
-        file_content = 'def my_function(): print(42) return 42\n'
-        fake_output = """
-    Function: my_function at line 5
-    Line #      Hits         Time  Per Hit   % Time  Line Contents
-    ==============================================================
-         5                                           def my_function():
-         6         2        100.0     50.0     50.0       print(42)
-         7         1         50.0     50.0     25.0       return 42
-            """
-
-        with patch("importlib.util.spec_from_file_location") as mock_spec, \
-                patch("importlib.util.module_from_spec") as mock_module_from_spec, \
-                patch("builtins.open", mock_open(read_data=file_content)), \
-                patch.object(self.analyzer, "target_module", mock_target_module), \
-                patch.object(self.analyzer, "line_profiler", self.mock_line_profiler), \
-                patch("io.StringIO") as mock_string_io:
-            mock_spec.return_value = MagicMock()
-            mock_module_from_spec.return_value = mock_target_module
-            mock_stream = MagicMock()
-            mock_stream.getvalue.return_value = fake_output
-            mock_string_io.return_value = mock_stream
+        source_file = tmp_path / "test.py"
+        source_file.write_text("\n\n\n\ndef my_function():\n    print(42)\n    return 42\n")
+        mock_stats = MagicMock()
+        mock_stats.unit = 1e-09
+        mock_stats.timings = {
+            (str(source_file), 5, "my_function"): [(7, 1, 50), (6, 2, 150)]
+        }
+        self.mock_line_profiler.get_stats.return_value = mock_stats
 
+        with patch.object(self.analyzer, "target_module", mock_target_module), \
+                patch.object(self.analyzer, "line_profiler", self.mock_line_profiler):
             result = self.analyzer._analyze_line_level()
             assert len(result["results"]) == 2
             assert result["results"][0]["line_number"] == 6
             assert result["results"][0]["code"] == 'print(42)'
+            assert result["results"][0]["function"] == "my_function"
+            assert math.isclose(result["results"][0]["per_hit"], 75e-09)
             assert result["results"][1]["percent_time"] == 25.0
+            assert math.isclose(result["results"][1]["total_time"], 50e-09)
 
     def test_analyze_line_level_with_error(self):
         mock_target_module = types.ModuleType("mock_module")
@@ -358,3 +338,17 @@ class TestAnalyzeLineLevel:
             mock_target_module.func.assert_called_once()
             assert isinstance(result, dict)
             assert "results" in result
+
+    def test_analyze_line_level_fast(self, tmp_path):
+        source_file = tmp_path / "fast_target.py"
+        source_file.write_text("def work():\n    total = sum(range(1000))\n    return total\n")
+        self.analyzer.load_module_from_file(str(source_file))
+
+        result = self.analyzer._analyze_line_level_fast(self.analyzer.target_module)
+        assert result["mode"] == "line"
+        assert result["estimated"] is True
+        assert [r["line_number"] for r in result["results"]] == [2, 3]
+        assert all(r["function"] == "work" and r["hits"] == 1 for r in result["results"])
+        assert result["results"][0]["code"] == "total = sum(range(1000))"
+        assert math.isclose(sum(r["percent_time"] for r in result["results"]), 100)
+        self.mock_line_profiler.enable.assert_not_called()
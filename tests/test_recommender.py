@@ -1,7 +1,23 @@
-from Py_Spy.recommender import generate_optimization_suggestions, ASTVisitor
+from Py_Spy.recommender import generate_optimization_suggestions, iter_optimization_suggestions, ASTVisitor
 import ast
 
 
+# Source shared by the line-level and all-modes tests, so its AST suggestions are computed once
+_EXAMPLE_CODE = """
+def process_data():
+    data = [x * 2 for x in range(100000)]
+    return sum(data)
+
+def call_process_data_0():
+    process_data()
+    return
+
+def call_process_data_1():
+    call_process_data_0()
+    return
+    """
+
+
 # Testing the ASTVisitor Class
 def test_ast_visitor():
     code = """
@@ -71,19 +87,7 @@ def call_process_data_1():
 
 # Test the generate_optimization_suggestions function under line-by-line analysis results
 def test_generate_optimization_suggestions_line_analysis():
-    code = """
-def process_data():
-    data = [x * 2 for x in range(100000)]
-    return sum(data)
-
-def call_process_data_0():
-    process_data()
-    return
-
-def call_process_data_1():
-    call_process_data_0()
-    return
-    """
+    code = _EXAMPLE_CODE
     analysis_result = {
         "mode": "line",
         "file": "data/sample_code/example2.py",
@@ -210,19 +214,7 @@ def invalid_function():
 
 # Test that all analysis modes exist
 def test_generate_optimization_suggestions_all_modes():
-    code = """
-def process_data():
-    data = [x * 2 for x in range(100000)]
-    return sum(data)
-
-def call_process_data_0():
-    process_data()
-    return
-
-def call_process_data_1():
-    call_process_data_0()
-    return
-    """
+    code = _EXAMPLE_CODE
     analysis_result = {
         "function": {
             "mode": "function",
@@ -344,3 +336,60 @@ def test_generate_optimization_suggestions_empty_input():
     suggestions = generate_optimization_suggestions(code, analysis_result)
     assert isinstance(suggestions, list)
     assert len(suggestions) == 0
+
+
+# Test that analyzing the same code again gives the same suggestions
+def test_generate_optimization_suggestions_repeated_code():
+    code = """
+def test_function():
+    for i in range(10):
+        result = 2 + 3
+        print(result)
+    """
+    first = generate_optimization_suggestions(code, {})
+    second = generate_optimization_suggestions(code, {})
+    assert first == second
+    # Cached suggestions are handed out as copies
+    first[0]['line'] = None
+    assert generate_optimization_suggestions(code, {}) == second
+    assert [suggestion['rule'] for suggestion in first] == ['cache_suggestion', 'loop_optimization']
+
+
+# Test that memory rows of one function give a single suggestion for it
+def test_generate_optimization_suggestions_memory_deduplicated():
+    analysis_result = {
+        "memory": {
+            "mode": "memory",
+            "file": "data/sample_code/example2.py",
+            "results": [
+                {"line_number": 2, "memory_usage": 150, "increment": 100, "function": "process_data"},
+                {"line_number": 3, "memory_usage": 200, "increment": 50, "function": "process_data"},
+                {"line_number": 6, "memory_usage": 210, "increment": 10, "function": "call_process_data_0"}
+            ]
+        }
+    }
+    suggestions = generate_optimization_suggestions("", analysis_result)
+    assert [(s['rule'], s['function']) for s in suggestions] == [
+        ('memory_optimization', 'process_data'),
+        ('memory_optimization', 'call_process_data_0')
+    ]
+
+
+# Test that the lazy variant yields the same suggestions as the list
+def test_iter_optimization_suggestions_matches_list():
+    code = """
+def process_data():
+    for i in range(10):
+        print(i)
+    """
+    analysis_result = {
+        "line": {
+            "mode": "line",
+            "results": [
+                {"line_number": 3, "hits": 150, "percent_time": 60, "function": "process_data"}
+            ]
+        }
+    }
+    suggestions = iter_optimization_suggestions(code, analysis_result)
+    assert not isinstance(suggestions, list)
+    assert list(suggestions) == generate_optimization_suggestions(code, analysis_result)